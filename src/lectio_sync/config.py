@@ -2,6 +2,7 @@ from __future__ import annotations
 
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, Callable, Mapping
 
 
 @dataclass(frozen=True)
@@ -15,6 +16,46 @@ class Config:
     emit_cancelled_events: bool
 
 
+_TRUE_TOKENS = frozenset({"1", "true", "yes", "y", "on"})
+_FALSE_TOKENS = frozenset({"0", "false", "no", "n", "off"})
+
+
+def _parse_int(name: str, raw: str) -> int:
+    try:
+        return int(raw)
+    except ValueError:
+        raise ValueError(f"Invalid integer for {name}: {raw!r}") from None
+
+
+def _parse_bool(name: str, raw: str) -> bool:
+    normalized = raw.strip().lower()
+    if normalized in _TRUE_TOKENS:
+        return True
+    if normalized in _FALSE_TOKENS:
+        return False
+    raise ValueError(f"Invalid boolean for {name}: {raw!r}")
+
+
+# (Config field, env var, parser, default) for the typed settings; CLI flags can override them.
+_FIELD_SPECS: tuple[tuple[str, str, Callable[[str, str], Any], Any], ...] = (
+    ("sync_days_past", "SYNC_DAYS_PAST", _parse_int, 7),
+    ("sync_days_future", "SYNC_DAYS_FUTURE", _parse_int, 90),
+    ("delete_missing", "DELETE_MISSING", _parse_bool, True),
+    ("emit_cancelled_events", "EMIT_CANCELLED_EVENTS", _parse_bool, False),
+)
+
+
+def _resolve_fields(env: Mapping[str, str], overrides: Mapping[str, Any]) -> dict[str, Any]:
+    resolved: dict[str, Any] = {}
+    for field_name, env_name, parse, default in _FIELD_SPECS:
+        value = overrides.get(field_name)
+        if value is None:
+            raw = env.get(env_name)
+            value = default if raw is None or raw.strip() == "" else parse(env_name, raw)
+        resolved[field_name] = value
+    return resolved
+
+
 def load_config_from_env() -> Config:
     import os
 
@@ -25,36 +66,11 @@ def load_config_from_env() -> Config:
     output_ics_path = Path(os.environ.get("OUTPUT_ICS_PATH", "docs/calendar.ics"))
     timezone = os.environ.get("LECTIO_TIMEZONE", "Europe/Copenhagen")
 
-    def _int(name: str, default: int) -> int:
-        raw = os.environ.get(name)
-        if raw is None or raw.strip() == "":
-            return default
-        return int(raw)
-
-    def _bool(name: str, default: bool) -> bool:
-        raw = os.environ.get(name)
-        if raw is None or raw.strip() == "":
-            return default
-        normalized = raw.strip().lower()
-        if normalized in {"1", "true", "yes", "y", "on"}:
-            return True
-        if normalized in {"0", "false", "no", "n", "off"}:
-            return False
-        raise ValueError(f"Invalid boolean for {name}: {raw!r}")
-
-    sync_days_past = _int("SYNC_DAYS_PAST", 7)
-    sync_days_future = _int("SYNC_DAYS_FUTURE", 90)
-    delete_missing = _bool("DELETE_MISSING", True)
-    emit_cancelled_events = _bool("EMIT_CANCELLED_EVENTS", False)
-
     return Config(
         lectio_html_path=lectio_html_path,
         output_ics_path=output_ics_path,
         timezone=timezone,
-        sync_days_past=sync_days_past,
-        sync_days_future=sync_days_future,
-        delete_missing=delete_missing,
-        emit_cancelled_events=emit_cancelled_events,
+        **_resolve_fields(os.environ, {}),
     )
 
 
@@ -75,48 +91,27 @@ def load_config_from_env_with_overrides(
 
     import os
 
-    def _env_path(name: str, default: str = "") -> Path:
-        return Path(os.environ.get(name, default))
-
-    resolved_html = lectio_html_path or _env_path("LECTIO_HTML_PATH")
+    env = os.environ
+    resolved_html = lectio_html_path or Path(env.get("LECTIO_HTML_PATH", ""))
     if not str(resolved_html):
         raise ValueError("LECTIO_HTML_PATH is required (or pass --html)")
 
-    resolved_out = output_ics_path or _env_path("OUTPUT_ICS_PATH", "docs/calendar.ics")
-    resolved_tz = timezone or os.environ.get("LECTIO_TIMEZONE", "Europe/Copenhagen")
-
-    def _int(name: str, default: int) -> int:
-        raw = os.environ.get(name)
-        if raw is None or raw.strip() == "":
-            return default
-        return int(raw)
-
-    def _bool(name: str, default: bool) -> bool:
-        raw = os.environ.get(name)
-        if raw is None or raw.strip() == "":
-            return default
-        normalized = raw.strip().lower()
-        if normalized in {"1", "true", "yes", "y", "on"}:
-            return True
-        if normalized in {"0", "false", "no", "n", "off"}:
-            return False
-        raise ValueError(f"Invalid boolean for {name}: {raw!r}")
-
-    resolved_sync_days_past = sync_days_past if sync_days_past is not None else _int("SYNC_DAYS_PAST", 7)
-    resolved_sync_days_future = sync_days_future if sync_days_future is not None else _int("SYNC_DAYS_FUTURE", 90)
-    resolved_delete_missing = delete_missing if delete_missing is not None else _bool("DELETE_MISSING", True)
-    resolved_emit_cancelled_events = (
-        emit_cancelled_events
-        if emit_cancelled_events is not None
-        else _bool("EMIT_CANCELLED_EVENTS", False)
+    resolved_out = output_ics_path or Path(env.get("OUTPUT_ICS_PATH", "docs/calendar.ics"))
+    resolved_tz = timezone or env.get("LECTIO_TIMEZONE", "Europe/Copenhagen")
+
+    fields = _resolve_fields(
+        env,
+        {
+            "sync_days_past": sync_days_past,
+            "sync_days_future": sync_days_future,
+            "delete_missing": delete_missing,
+            "emit_cancelled_events": emit_cancelled_events,
+        },
     )
 
     return Config(
         lectio_html_path=resolved_html,
         output_ics_path=resolved_out,
         timezone=resolved_tz,
-        sync_days_past=resolved_sync_days_past,
-        sync_days_future=resolved_sync_days_future,
-        delete_missing=resolved_delete_missing,
-        emit_cancelled_events=resolved_emit_cancelled_events,
+        **fields,
     )
@@ -1,11 +1,11 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import date, datetime
 from typing import Optional
 
 
-@dataclass(frozen=True)
+@dataclass(frozen=True, slots=True)
 class LectioEvent:
     uid: str
     title: str
@@ -15,7 +15,8 @@ class LectioEvent:
     location: str
     description: str
     status: str = "CONFIRMED"
+    # Derived from all_day_date once, so sort keys read a plain slot instead of a property.
+    is_all_day: bool = field(init=False, repr=False, compare=False)
 
-    @property
-    def is_all_day(self) -> bool:
-        return self.all_day_date is not None
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "is_all_day", self.all_day_date is not None)
@@ -0,0 +1,111 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import time
+from datetime import date, timedelta
+from pathlib import Path
+from typing import Iterable
+
+from lectio_sync.lectio_fetch import LectioWeek
+
+
+# Weeks this close to today change often (substitutions, cancellations), so
+# their validators are only trusted for a day before we force a full fetch.
+_NEAR_WEEK_DAYS = 7
+_NEAR_WEEK_MAX_AGE_SECONDS = 24 * 60 * 60
+
+
+def _week_key(schedule_url: str, week: LectioWeek) -> str:
+    # Hash so the cache file does not spell out the (private) schedule URL.
+    return hashlib.sha256(f"{schedule_url}\n{week.week_param}".encode("utf-8")).hexdigest()
+
+
+def _is_near_week(week: LectioWeek, today: date) -> bool:
+    monday = date.fromisocalendar(week.year, week.week, 1)
+    sunday = monday + timedelta(days=6)
+    return monday <= today + timedelta(days=_NEAR_WEEK_DAYS) and sunday >= today - timedelta(days=_NEAR_WEEK_DAYS)
+
+
+class WeekPageCache:
+    """On-disk ETag/Last-Modified validators plus the last HTML seen per week page.
+
+    Used to send conditional GETs so unchanged weeks come back as 304 Not Modified
+    and the cached HTML is reused instead of downloading the page again.
+
+    WARNING: the cache file contains private schedule data.
+    """
+
+    def __init__(self, path: Path, entries: dict[str, dict] | None = None) -> None:
+        self.path = path
+        self._entries: dict[str, dict] = entries or {}
+
+    @classmethod
+    def load(cls, path: Path) -> "WeekPageCache":
+        try:
+            entries = json.loads(path.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            entries = {}
+        if not isinstance(entries, dict):
+            entries = {}
+        return cls(path, entries)
+
+    def validators(
+        self,
+        schedule_url: str,
+        weeks: Iterable[LectioWeek],
+        *,
+        today: date,
+        now: float | None = None,
+    ) -> dict[str, tuple[str, str]]:
+        """Return week_param -> (etag, last_modified) for weeks worth revalidating."""
+
+        now = time.time() if now is None else now
+        out: dict[str, tuple[str, str]] = {}
+        for wk in weeks:
+            entry = self._entries.get(_week_key(schedule_url, wk))
+            if not entry or not (entry.get("etag") or entry.get("last_modified")):
+                continue
+            if _is_near_week(wk, today) and now - entry.get("stored_at", 0) > _NEAR_WEEK_MAX_AGE_SECONDS:
+                continue
+            out[wk.week_param] = (entry.get("etag", ""), entry.get("last_modified", ""))
+        return out
+
+    def cached_html(self, schedule_url: str, week: LectioWeek) -> str | None:
+        entry = self._entries.get(_week_key(schedule_url, week))
+        return entry.get("html") if entry else None
+
+    def store(
+        self,
+        schedule_url: str,
+        week: LectioWeek,
+        html: str,
+        *,
+        etag: str,
+        last_modified: str,
+        now: float | None = None,
+    ) -> None:
+        key = _week_key(schedule_url, week)
+        if not (etag or last_modified):
+            # Nothing to revalidate with next time.
+            self._entries.pop(key, None)
+            return
+        self._entries[key] = {
+            "etag": etag,
+            "last_modified": last_modified,
+            "stored_at": time.time() if now is None else now,
+            "html": html,
+        }
+
+    def prune(self, schedule_url: str, weeks: Iterable[LectioWeek]) -> None:
+        """Drop entries for weeks that are no longer part of the sync window."""
+
+        keep = {_week_key(schedule_url, wk) for wk in weeks}
+        self._entries = {k: v for k, v in self._entries.items() if k in keep}
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        tmp_path.write_text(json.dumps(self._entries), encoding="utf-8")
+        os.replace(tmp_path, self.path)
@@ -3,32 +3,72 @@ from __future__ import annotations
 import hashlib
 import re
 import unicodedata
-from dataclasses import dataclass
-from datetime import date, datetime, time, timedelta
+from datetime import date, datetime, timedelta, tzinfo
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
+from typing import NamedTuple, Optional
 from urllib.parse import parse_qs, urlparse
 
-from bs4 import BeautifulSoup
 from dateutil import tz
+from lxml import etree
+from lxml import html as lxml_html
 
 from lectio_sync.event_model import LectioEvent
 
 
 _TABLE_ID = "m_Content_SkemaMedNavigation_skema_skematabel"
 
+# Compiled once; "contains(concat(...))" is the XPath form of a CSS class selector.
+_SCHEDULE_TABLE_XPATH = etree.XPath("//table[@id=$table_id]")
+_SCHEDULE_TABLE_START_RE = re.compile(
+    r"<table\b[^>]*\bid\s*=\s*[\"']?" + re.escape(_TABLE_ID) + r"[\"'\s>]", re.IGNORECASE
+)
+_FALLBACK_TABLE_XPATH = etree.XPath(
+    "//table[.//td[@data-date] and "
+    ".//a[contains(concat(' ', normalize-space(@class), ' '), ' s2skemabrik ')]]"
+)
+_HAS_DATE_CELLS_XPATH = etree.XPath("boolean(.//td[@data-date])")
+_HAS_BRICKS_XPATH = etree.XPath("boolean(.//a[contains(concat(' ', normalize-space(@class), ' '), ' s2skemabrik ')])")
+_BRICK_CONTENT_XPATH = etree.XPath(
+    "(.//div[contains(concat(' ', normalize-space(@class), ' '), ' s2skemabrikcontent ')])[1]"
+)
+# Same token match as the XPath class test (normalize-space splits on XML whitespace only).
+_BRICK_CLASS_RE = re.compile(r"(?:^|[ \t\r\n])s2skemabrik(?:[ \t\r\n]|$)")
+
 _ALL_DAY_KEEP_MARKERS = ("alle:", "2.g:")
 _TIMED_DROP_MARKERS = ("lego klubben", "armwrestling", "armwrestling-klubben")
 
+# Whitespace inside the pattern never crosses a newline, so one search over a whole
+# tooltip finds the same match as searching it line by line.
 _DATE_LINE_RE = re.compile(
-    r"(?P<day>\d{1,2})/(?P<month>\d{1,2})-(?P<year>\d{4})\s+"
-    r"(?:(?P<all_day>Hele\s+dagen|All\s+day)|(?P<start>\d{2}:\d{2})\s+til\s+(?P<end>\d{2}:\d{2}))",
+    r"(?P<day>\d{1,2})/(?P<month>\d{1,2})-(?P<year>\d{4})[^\S\n]+"
+    r"(?:(?P<all_day>Hele[^\S\n]+dagen|All[^\S\n]+day)|(?P<start>\d{2}:\d{2})[^\S\n]+til[^\S\n]+(?P<end>\d{2}:\d{2}))",
     re.IGNORECASE,
 )
+_TAG_RE = re.compile(r"<[^>]+>")
+_BULLET_PREFIX_RE = re.compile(r"^(?:- \s*)+")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+# First "Lærer:" / "Lærere:" line of a normalized tooltip (lines are already stripped).
+_TEACHER_LINE_RE = re.compile(r"^lærere?:(.*)$", re.IGNORECASE | re.MULTILINE)
+_ROOM_LINE_RE = re.compile(r"^lokale:(.*)$", re.IGNORECASE | re.MULTILINE)
+
+# First tooltip line that only marks the brick's status; the title follows it.
+_STATUS_LINE_TITLES = frozenset({"ændret!", "changed!", "aflyst!", "cancelled!", "canceled!"})
+_CANCEL_CLASSES = frozenset({"s2cancelled", "cancelled", "canceled", "aflyst"})
+# Heuristic keywords. If you provide exact wording, we can tighten this.
+_CANCEL_KEYWORDS = ("aflyst", "aflyses", "cancelled", "canceled", "annulleret", "annullered")
+
+
+@lru_cache(maxsize=8)
+def _get_tz(timezone_name: str):
+    # Resolved for every parsed page and window filter, so cache the lookup (including the unknown-name check).
+    local_tz = tz.gettz(timezone_name)
+    if local_tz is None:
+        raise ValueError(f"Unknown timezone: {timezone_name}")
+    return local_tz
 
 
-@dataclass(frozen=True)
-class _TooltipParsed:
+class _TooltipParsed(NamedTuple):
     title: str
     start: Optional[datetime]
     end: Optional[datetime]
@@ -43,42 +83,24 @@ def _normalize_text(raw: str) -> str:
         return ""
 
     text = raw.strip()
-    text = text.replace("\r\n", "\n").replace("\r", "\n")
-
-    text = unicodedata.normalize("NFC", text)
-
-    text = re.sub(r"<[^>]+>", "", text)
-
-    lines = [ln.rstrip() for ln in text.split("\n")]
-
-    cleaned: list[str] = []
-    previous_blank = False
-    for ln in lines:
-        stripped = ln.strip()
-        if stripped.startswith("- "):
-            stripped = stripped[2:]
-        if stripped == "":
-            if previous_blank:
-                continue
-            previous_blank = True
-            cleaned.append("")
-            continue
-        previous_blank = False
-        cleaned.append(stripped)
 
-    while cleaned and cleaned[0] == "":
-        cleaned.pop(0)
-    while cleaned and cleaned[-1] == "":
-        cleaned.pop()
+    # ASCII is already NFC; most tooltips are times, rooms and codes. For the rest,
+    # normalize() runs the NFC quick check itself and returns the input unchanged.
+    if not text.isascii():
+        text = unicodedata.normalize("NFC", text)
 
-    return "\n".join(cleaned)
+    text = _TAG_RE.sub("", text)
 
-
-def _first_meaningful_line(lines: list[str]) -> Optional[str]:
-    for ln in lines:
-        if ln.strip() != "":
-            return ln.strip()
-    return None
+    # splitlines() also handles \r\n and \r. Every leading bullet is stripped so that
+    # normalizing twice changes nothing; runs of blank lines collapse to one.
+    # The startswith() guard keeps bullet-free lines (nearly all) out of the regex engine.
+    cleaned = "\n".join(
+        [
+            _BULLET_PREFIX_RE.sub("", ln) if ln.startswith("- ") else ln
+            for ln in map(str.strip, text.splitlines())
+        ]
+    )
+    return _BLANK_LINES_RE.sub("\n\n", cleaned).strip("\n")
 
 
 def _line_looks_like_datetime(line: str) -> bool:
@@ -86,6 +108,11 @@ def _line_looks_like_datetime(line: str) -> bool:
 
 
 def _parse_date_from_data_date(raw: str) -> date:
+    # Lectio emits zero-padded YYYY-MM-DD; the split below still accepts unpadded parts.
+    try:
+        return date.fromisoformat(raw)
+    except ValueError:
+        pass
     try:
         year_s, month_s, day_s = raw.split("-")
         return date(int(year_s), int(month_s), int(day_s))
@@ -94,35 +121,22 @@ def _parse_date_from_data_date(raw: str) -> date:
 
 
 def _parse_tooltip(
-    tooltip_text: str,
-    content_fallback_title: str,
+    normalized: str,
+    content_fallback_title_normalized: str,
     inherited_date: Optional[date],
-    timezone_name: str,
+    local_tz: tzinfo,
 ) -> _TooltipParsed:
-    normalized = _normalize_text(tooltip_text)
-    lines = normalized.split("\n") if normalized else []
-
-    meaningful = [ln.strip() for ln in lines if ln.strip() != ""]
-    title_line = _first_meaningful_line(meaningful) or ""
-
-    if title_line.lower() in {"ændret!", "changed!", "aflyst!", "cancelled!", "canceled!"}:
-        meaningful = meaningful[1:]
-        title_line = _first_meaningful_line(meaningful) or ""
+    # `normalized` has stripped lines and no leading blank line, so the first line is the
+    # first meaningful one; lstrip("\n") skips blank lines to reach the next.
+    title_line, _, rest = normalized.partition("\n")
+    if title_line.lower() in _STATUS_LINE_TITLES:
+        title_line = rest.lstrip("\n").partition("\n")[0]
 
     title = title_line
     if title == "" or _line_looks_like_datetime(title):
-        title = _normalize_text(content_fallback_title).split("\n")[0].strip() or "(Untitled)"
-
-    parsed_date_line: Optional[re.Match[str]] = None
-    for idx, ln in enumerate(lines):
-        m = _DATE_LINE_RE.search(ln)
-        if m:
-            parsed_date_line = m
-            break
+        title = content_fallback_title_normalized.split("\n", 1)[0].strip() or "(Untitled)"
 
-    local_tz = tz.gettz(timezone_name)
-    if local_tz is None:
-        raise ValueError(f"Unknown timezone: {timezone_name}")
+    parsed_date_line = _DATE_LINE_RE.search(normalized)
 
     start_dt: Optional[datetime] = None
     end_dt: Optional[datetime] = None
@@ -141,23 +155,17 @@ def _parse_tooltip(
             start_s = parsed_date_line.group("start")
             end_s = parsed_date_line.group("end")
             if start_s and end_s:
-                sh, sm = [int(x) for x in start_s.split(":")]
-                eh, em = [int(x) for x in end_s.split(":")]
-                start_dt = datetime.combine(effective_date, time(sh, sm)).replace(tzinfo=local_tz)
-                end_dt = datetime.combine(effective_date, time(eh, em)).replace(tzinfo=local_tz)
+                # Both are HH:MM (the regex requires two digits each side).
+                start_dt = datetime(year, month, day, int(start_s[:2]), int(start_s[3:]), tzinfo=local_tz)
+                end_dt = datetime(year, month, day, int(end_s[:2]), int(end_s[3:]), tzinfo=local_tz)
                 if end_dt <= start_dt:
                     end_dt = end_dt + timedelta(days=1)
 
     if effective_date is None:
         effective_date = inherited_date
 
-    room = ""
-    room_index: Optional[int] = None
-    for idx, ln in enumerate(lines):
-        if ln.strip().lower().startswith("lokale:"):
-            room_index = idx
-            room = ln.split(":", 1)[1].strip() if ":" in ln else ""
-            break
+    m = _ROOM_LINE_RE.search(normalized)
+    room = m.group(1).strip() if m else ""
 
     return _TooltipParsed(
         title=title,
@@ -171,85 +179,126 @@ def _parse_tooltip(
 
 
 def _looks_cancelled(tooltip: str, content_text: str) -> bool:
+    # Plain substring scans beat a compiled alternation regex (~3x) on tooltip-sized text.
     combined = (tooltip + "\n" + content_text).lower()
-    # Heuristic keywords. If you provide exact wording, we can tighten this.
-    return any(
-        kw in combined
-        for kw in [
-            "aflyst",
-            "aflyses",
-            "cancelled",
-            "canceled",
-            "annulleret",
-            "annullered",
-        ]
-    )
+    for kw in _CANCEL_KEYWORDS:
+        if kw in combined:
+            return True
+    return False
 
 
 def _is_cancelled_event(tooltip: str, content_text: str, classes: list[str]) -> bool:
-    class_set = {c.strip().lower() for c in classes if c and c.strip()}
-    if {
-        "s2cancelled",
-        "cancelled",
-        "canceled",
-        "aflyst",
-    }.intersection(class_set):
-        return True
-
-    tooltip_first = _first_meaningful_line(_normalize_text(tooltip).split("\n") if tooltip else [])
-    if tooltip_first and tooltip_first.strip().lower() in {
-        "aflyst!",
-        "aflyst",
-        "cancelled!",
-        "cancelled",
-        "canceled!",
-        "canceled",
-        "annulleret!",
-        "annulleret",
-    }:
-        return True
+    # Cheapest signal first: Lectio marks most cancelled bricks with a CSS class.
+    for c in classes:
+        if c.lower() in _CANCEL_CLASSES:
+            return True
 
+    # A cancel marker on the first tooltip line ("Aflyst!", "Cancelled", ...) always
+    # contains one of the keywords, so a single keyword scan covers both checks.
     return _looks_cancelled(tooltip, content_text)
 
 
-def _locate_schedule_table(soup: BeautifulSoup):
-    table = soup.find("table", id=_TABLE_ID)
-    if table is not None:
-        return table, f"id={_TABLE_ID}"
+def _read_html_file(path: Path) -> str:
+    # Binary read + decode skips text-mode newline translation (~3x faster on large
+    # pages); the parser handles \r\n itself. Invalid UTF-8 is still replaced.
+    return path.read_bytes().decode("utf-8", errors="replace")
 
-    candidate_tables = []
-    for candidate in soup.find_all("table"):
-        if candidate.find("td", attrs={"data-date": True}) is None:
-            continue
-        if candidate.find("a", class_=lambda c: c and "s2skemabrik" in c.split()) is None:
-            continue
-        candidate_tables.append(candidate)
+
+def _parse_document(html: str):
+    try:
+        return lxml_html.document_fromstring(html)
+    except etree.ParserError:
+        # lxml rejects empty documents; treat them as a page without the expected table.
+        return lxml_html.document_fromstring("<html></html>")
+
+
+def _parse_schedule_document(html: str):
+    """Parse the page from the schedule table's start tag onwards when it can be found.
+
+    Lectio pages carry 100+ KB of view state and navigation before the table, and
+    building that part of the tree is most of the parse time. Falls back to the full
+    page when the tag is not found or the cut-down page does not yield the table.
+    """
+
+    m = _SCHEDULE_TABLE_START_RE.search(html)
+    if m is not None:
+        doc = _parse_document(html[m.start():])
+        if _SCHEDULE_TABLE_XPATH(doc, table_id=_TABLE_ID):
+            return doc
+    return _parse_document(html)
+
+
+def _text(element, separator: str = "") -> str:
+    # Same result as BeautifulSoup's get_text(separator): text nodes only, comments skipped.
+    return separator.join(element.itertext())
+
+
+def _locate_schedule_table(doc):
+    tables = _SCHEDULE_TABLE_XPATH(doc, table_id=_TABLE_ID)
+    if tables:
+        return tables[0], f"id={_TABLE_ID}"
+
+    candidate_tables = _FALLBACK_TABLE_XPATH(doc)
 
     if candidate_tables:
         return candidate_tables[0], "fallback=table with td[data-date] + a.s2skemabrik"
 
     signatures: list[str] = []
-    for idx, t in enumerate(soup.find_all("table"), start=1):
+    for idx, t in enumerate(doc.iter("table"), start=1):
         table_id = (t.get("id") or "").strip() or "(no-id)"
-        classes = " ".join(t.get("class") or []) or "(no-class)"
-        has_date_td = t.find("td", attrs={"data-date": True}) is not None
-        has_bricks = t.find("a", class_=lambda c: c and "s2skemabrik" in c.split()) is not None
+        classes = " ".join((t.get("class") or "").split()) or "(no-class)"
+        has_date_td = _HAS_DATE_CELLS_XPATH(t)
+        has_bricks = _HAS_BRICKS_XPATH(t)
         signatures.append(
             f"#{idx}: id={table_id}, class={classes}, has_date_cells={has_date_td}, has_bricks={has_bricks}"
         )
         if idx >= 10:
             break
-            return False  # Reverting to original state, no custom filter
     details = " | ".join(signatures) if signatures else "No <table> elements found"
     raise ValueError(
         f"Could not locate Lectio schedule table. Tried id={_TABLE_ID!r} and fallback selector. Found tables: {details}"
     )
 
 
+def _cell_date(td) -> Optional[date]:
+    raw_data_date = td.get("data-date")
+    return _parse_cell_date(raw_data_date) if raw_data_date else None
+
+
+@lru_cache(maxsize=512)
+def _parse_cell_date(raw_data_date: str) -> Optional[date]:
+    # Only a few distinct dates per page; invalid values are cached as None too.
+    try:
+        return _parse_date_from_data_date(raw_data_date)
+    except ValueError:
+        return None
+
+
+def _iter_dated_bricks(table):
+    """Yield (brick, inherited_date) in document order, parsing each cell's data-date once.
+
+    A brick inherits the data-date of its nearest enclosing <td>. One walk over the
+    table keeps a stack of open cells instead of searching upwards from every brick.
+    """
+
+    outer_td = next(table.iterancestors("td"), None)
+    cell_dates: list[Optional[date]] = [_cell_date(outer_td) if outer_td is not None else None]
+    for event, element in etree.iterwalk(table, events=("start", "end"), tag=("td", "a")):
+        if element.tag == "td":
+            if event == "start":
+                cell_dates.append(_cell_date(element))
+            else:
+                cell_dates.pop()
+        elif event == "start" and _BRICK_CLASS_RE.search(element.get("class") or ""):
+            yield element, cell_dates[-1]
+
+
 def _build_uid(brikid: Optional[str], tooltip: str, effective_date: date) -> str:
     if brikid:
         return f"{brikid}@lectio.dk"
-    stable_source = _normalize_text(tooltip) + "\n" + effective_date.isoformat()
+    stable_source = tooltip + "\n" + effective_date.isoformat()
+    # Kept on SHA-256: these UIDs are already in subscribed calendars, and a faster hash
+    # (blake2b/xxhash) would turn every brikid-less event into a delete + re-add.
     digest = hashlib.sha256(stable_source.encode("utf-8")).hexdigest()[:24]
     return f"lectio-{digest}@lectio.dk"
 
@@ -257,13 +306,8 @@ def _build_uid(brikid: Optional[str], tooltip: str, effective_date: date) -> str
 def _compose_title(base_title: str, tooltip: str, room: str) -> str:
     # Requirement: title should include subject + teacher + room when available.
     # We extract teachers from lines like "Lærer:" / "Lærere:" and append room.
-    t = _normalize_text(tooltip)
-    teachers: str = ""
-    for ln in t.split("\n"):
-        low = ln.lower()
-        if low.startswith("lærer:") or low.startswith("lærere:"):
-            teachers = ln.split(":", 1)[1].strip() if ":" in ln else ""
-            break
+    m = _TEACHER_LINE_RE.search(tooltip)
+    teachers = m.group(1).strip() if m else ""
 
     parts = [base_title.strip()]
     if teachers:
@@ -282,6 +326,16 @@ def _is_filtered_by_custom_rules(*, is_all_day: bool, title: str, description: s
     return any(marker in haystack for marker in _TIMED_DROP_MARKERS)
 
 
+_MIN_DT_UTC = datetime.min.replace(tzinfo=tz.UTC)
+
+
+def event_sort_key(ev: LectioEvent):
+    """Order in which parse results are returned: all-day events first, then by start."""
+    if ev.is_all_day:
+        return (0, ev.all_day_date or date.min, ev.title, ev.uid)
+    return (1, ev.start or _MIN_DT_UTC, ev.title, ev.uid)
+
+
 def parse_lectio_advanced_schedule_html(
     html_path: Path,
     timezone_name: str,
@@ -291,7 +345,7 @@ def parse_lectio_advanced_schedule_html(
     emit_cancelled_events: bool = False,
     debug: bool = False,
 ) -> list[LectioEvent]:
-    html = html_path.read_text(encoding="utf-8", errors="replace")
+    html = _read_html_file(html_path)
     return parse_lectio_advanced_schedule_html_text(
         html,
         timezone_name,
@@ -311,11 +365,10 @@ def parse_lectio_advanced_schedule_html_text(
     emit_cancelled_events: bool = False,
     debug: bool = False,
 ) -> list[LectioEvent]:
-    # Use Python's builtin parser to avoid lxml/bs4 deprecation warnings
-    # while remaining robust for the Lectio HTML used in tests.
-    soup = BeautifulSoup(html, "html.parser")
+    doc = _parse_schedule_document(html)
 
-    table, table_selector_used = _locate_schedule_table(soup)
+    table, table_selector_used = _locate_schedule_table(doc)
+    local_tz = _get_tz(timezone_name)
 
     events: list[LectioEvent] = []
     seen_uids: set[str] = set()
@@ -330,37 +383,38 @@ def parse_lectio_advanced_schedule_html_text(
     duplicate_uid_examples: list[str] = []
     cancelled_emitted = 0
 
-    for a in table.find_all("a", class_=lambda c: c and "s2skemabrik" in c.split()):
+    for a, inherited_date in _iter_dated_bricks(table):
         bricks_found += 1
 
-        inherited_date: Optional[date] = None
-        parent_td = a.find_parent("td")
-        if parent_td is not None and parent_td.has_attr("data-date"):
-            raw_data_date = parent_td.get("data-date")
-            if raw_data_date:
-                try:
-                    inherited_date = _parse_date_from_data_date(raw_data_date)
-                except ValueError:
-                    inherited_date = None
+        # Lectio repeats bricks across views; a brikid UID is known before any parsing,
+        # so skip bricks already emitted without normalizing their text.
+        brikid = a.get("data-brikid")
+        brikid_uid = f"{brikid}@lectio.dk" if brikid else None
+        if brikid_uid in seen_uids:
+            skipped_duplicate_uid += 1
+            if len(duplicate_uid_examples) < 5:
+                duplicate_uid_examples.append(brikid_uid)
+            continue
 
         tooltip_raw = a.get("data-tooltip") or ""
+        # Normalized once here; the helpers below all take the normalized tooltip.
         tooltip = _normalize_text(tooltip_raw)
 
-        content_div = a.find("div", class_="s2skemabrikcontent")
-        content_text = _normalize_text(content_div.get_text("\n") if content_div else a.get_text("\n"))
+        content_divs = _BRICK_CONTENT_XPATH(a)
+        content_text = _normalize_text(_text(content_divs[0] if content_divs else a, "\n"))
 
         if tooltip.strip() == "" and content_text.strip() == "":
             skipped_empty += 1
             continue
 
         # Cancellation can also show up as CSS classes.
-        class_list = [str(c) for c in (a.get("class") or [])]
+        class_list = (a.get("class") or "").split()
         is_cancelled = _is_cancelled_event(tooltip, content_text, class_list)
         if is_cancelled and not emit_cancelled_events:
             skipped_cancelled += 1
             continue
 
-        parsed = _parse_tooltip(tooltip, content_text, inherited_date, timezone_name)
+        parsed = _parse_tooltip(tooltip, content_text, inherited_date, local_tz)
         effective_date = parsed.effective_date
         if effective_date is None:
             skipped_missing_date += 1
@@ -371,7 +425,6 @@ def parse_lectio_advanced_schedule_html_text(
             skipped_missing_time += 1
             continue
 
-        brikid = a.get("data-brikid")
         uid = _build_uid(brikid, tooltip, effective_date)
         if uid in seen_uids:
             skipped_duplicate_uid += 1
@@ -408,8 +461,6 @@ def parse_lectio_advanced_schedule_html_text(
         if is_cancelled:
             cancelled_emitted += 1
 
-    pre_filter_count = len(events)
-
     if debug:
         print(
             "Parse stats: "
@@ -428,51 +479,69 @@ def parse_lectio_advanced_schedule_html_text(
         if duplicate_uid_examples:
             print("Duplicate UID examples (first 5): " + ", ".join(duplicate_uid_examples))
 
+    # Filter first so only the events in the window get sorted.
+    events = filter_events_to_window(
+        events,
+        timezone_name,
+        sync_days_past=sync_days_past,
+        sync_days_future=sync_days_future,
+        debug=debug,
+    )
     # Keep deterministic ordering
-    def _sort_key(ev: LectioEvent):
-        if ev.is_all_day:
-            return (0, ev.all_day_date or date.min, ev.title, ev.uid)
-        return (1, (ev.start or datetime.min.replace(tzinfo=tz.UTC)), ev.title, ev.uid)
+    events.sort(key=event_sort_key)
+    return events
 
-    events.sort(key=_sort_key)
 
-    if sync_days_past is not None or sync_days_future is not None:
-        past = 7 if sync_days_past is None else sync_days_past
-        future = 90 if sync_days_future is None else sync_days_future
-        local_tz = tz.gettz(timezone_name)
-        if local_tz is None:
-            raise ValueError(f"Unknown timezone: {timezone_name}")
-        today = datetime.now(local_tz).date()
-        window_start = today - timedelta(days=past)
-        window_end = today + timedelta(days=future)
-
-        def _event_date(ev: LectioEvent) -> Optional[date]:
-            if ev.is_all_day:
-                return ev.all_day_date
-            if ev.start is None:
-                return None
-            try:
-                return ev.start.astimezone(local_tz).date()
-            except Exception:
-                return ev.start.date()
-
-        events = [
-            ev
-            for ev in events
-            if (d := _event_date(ev)) is not None and window_start <= d <= window_end
-        ]
+def filter_events_to_window(
+    events: list[LectioEvent],
+    timezone_name: str,
+    *,
+    sync_days_past: int | None = None,
+    sync_days_future: int | None = None,
+    debug: bool = False,
+) -> list[LectioEvent]:
+    """Keep events whose local date lies within [today - past, today + future].
 
+    Order is preserved. When both bounds are None the events are returned as-is.
+    """
+
+    if sync_days_past is None and sync_days_future is None:
         if debug:
-            print(
-                "Window filter: "
-                f"today={today.isoformat()}, "
-                f"window_start={window_start.isoformat()}, "
-                f"window_end={window_end.isoformat()}, "
-                f"before={pre_filter_count}, "
-                f"after={len(events)}"
-            )
-    elif debug:
-        print("Window filter: disabled (both sync_days_past and sync_days_future are None)")
+            print("Window filter: disabled (both sync_days_past and sync_days_future are None)")
+        return events
+
+    pre_filter_count = len(events)
+    past = 7 if sync_days_past is None else sync_days_past
+    future = 90 if sync_days_future is None else sync_days_future
+    local_tz = _get_tz(timezone_name)
+    today = datetime.now(local_tz).date()
+    window_start = today - timedelta(days=past)
+    window_end = today + timedelta(days=future)
+
+    def _event_date(ev: LectioEvent) -> Optional[date]:
+        if ev.is_all_day:
+            return ev.all_day_date
+        if ev.start is None:
+            return None
+        if ev.start.tzinfo is None:
+            return ev.start.date()
+        return ev.start.astimezone(local_tz).date()
+
+    events = [
+        ev
+        for ev in events
+        if (d := _event_date(ev)) is not None and window_start <= d <= window_end
+    ]
+
+    if debug:
+        print(
+            "Window filter: "
+            f"today={today.isoformat()}, "
+            f"window_start={window_start.isoformat()}, "
+            f"window_end={window_end.isoformat()}, "
+            f"before={pre_filter_count}, "
+            f"after={len(events)}"
+        )
 
     return events
 
@@ -486,26 +555,32 @@ _ASSIGNMENT_DATE_RE = re.compile(
 )
 
 
-def _locate_assignments_table(soup: BeautifulSoup):
+_ASSIGNMENTS_TABLE_XPATH = etree.XPath("//table[@id='s_m_Content_Content_ExerciseGV']")
+# XPath 1.0 has no ends-with(); compare the last len("_ExerciseGV") characters instead.
+_ASSIGNMENTS_TABLE_SUFFIX_XPATH = etree.XPath(
+    "//table[substring(@id, string-length(@id) - 10) = '_ExerciseGV']"
+)
+
+
+def _locate_assignments_table(doc):
     """Return the assignments table, or raise ValueError if not found."""
     # Primary: exact id
-    table = soup.find("table", id="s_m_Content_Content_ExerciseGV")
-    if table is not None:
-        return table
+    tables = _ASSIGNMENTS_TABLE_XPATH(doc)
+    if tables:
+        return tables[0]
 
     # Fallback 1: any table whose id ends with _ExerciseGV
-    for t in soup.find_all("table"):
-        tid = (t.get("id") or "")
-        if tid.endswith("_ExerciseGV"):
-            return t
+    tables = _ASSIGNMENTS_TABLE_SUFFIX_XPATH(doc)
+    if tables:
+        return tables[0]
 
     # Fallback 2: table that contains both "Opgavetitel" and "Frist" header text
-    for t in soup.find_all("table"):
-        text = t.get_text()
+    for t in doc.iter("table"):
+        text = _text(t)
         if "Opgavetitel" in text and "Frist" in text:
             return t
 
-    ids = [t.get("id") or "(no-id)" for t in soup.find_all("table")][:10]
+    ids = [t.get("id") or "(no-id)" for t in doc.iter("table")][:10]
     raise ValueError(
         "Could not locate assignments table. "
         "Expected <table id='s_m_Content_Content_ExerciseGV'> or a table ending with '_ExerciseGV' "
@@ -522,7 +597,7 @@ def parse_lectio_assignments_html(
     debug: bool = False,
 ) -> list[LectioEvent]:
     """Parse an OpgaverElev.aspx HTML file into upcoming assignment LectioEvent objects."""
-    html = path.read_text(encoding="utf-8", errors="replace")
+    html = _read_html_file(path)
     return parse_lectio_assignments_html_text(html, timezone_name, today=today, debug=debug)
 
 
@@ -539,13 +614,11 @@ def parse_lectio_assignments_html_text(
       td[1] Hold, td[2] Opgavetitel (with anchor + exerciseid),
       td[3] Frist, td[4] Elevtid, td[5] Status, td[8] Opgavenote.
     """
-    soup = BeautifulSoup(html, "html.parser")
+    doc = _parse_document(html)
 
-    table = _locate_assignments_table(soup)
+    table = _locate_assignments_table(doc)
 
-    local_tz = tz.gettz(timezone_name)
-    if local_tz is None:
-        raise ValueError(f"Unknown timezone: {timezone_name}")
+    local_tz = _get_tz(timezone_name)
 
     if today is None:
         today = datetime.now(local_tz).date()
@@ -555,8 +628,8 @@ def parse_lectio_assignments_html_text(
     rows_skipped_parse = 0
     rows_skipped_past = 0
 
-    for tr in table.find_all("tr"):
-        tds = tr.find_all("td")
+    for tr in table.iter("tr"):
+        tds = list(tr.iter("td"))
         if len(tds) < 5:
             # Skip header rows (which use <th>) and any degenerate rows.
             continue
@@ -564,17 +637,17 @@ def parse_lectio_assignments_html_text(
         rows_found += 1
 
         # -- Hold (index 0, 1-based td[1]) --
-        hold = tds[0].get_text(separator=" ").strip()
+        hold = _text(tds[0], " ").strip()
 
         # -- Opgavetitel + exerciseid (index 1, 1-based td[2]) --
-        anchor = tds[1].find("a")
+        anchor = tds[1].find(".//a")
         if anchor is None:
             rows_skipped_parse += 1
             if debug:
                 print(f"Assignments parser: row {rows_found} skipped — no anchor in Opgavetitel column")
             continue
 
-        opgavetitel = anchor.get_text(separator=" ").strip()
+        opgavetitel = _text(anchor, " ").strip()
         href = anchor.get("href", "")
         exerciseid: Optional[str] = None
         try:
@@ -593,7 +666,7 @@ def parse_lectio_assignments_html_text(
             continue
 
         # -- Frist (index 2, 1-based td[3]) --
-        frist_raw = tds[2].get_text(separator=" ").strip()
+        frist_raw = _text(tds[2], " ").strip()
         m = _ASSIGNMENT_DATE_RE.search(frist_raw)
         if not m:
             rows_skipped_parse += 1
@@ -615,15 +688,15 @@ def parse_lectio_assignments_html_text(
             continue
 
         # -- Elevtid (index 3, 1-based td[4]) --
-        elevtid = tds[3].get_text(separator=" ").strip()
+        elevtid = _text(tds[3], " ").strip()
 
         # -- Status (index 4, 1-based td[5]) --
-        status_raw = tds[4].get_text(separator=" ").strip()
+        status_raw = _text(tds[4], " ").strip()
 
         # -- Opgavenote (index 7, 1-based td[8]) --
         opgavenote = ""
         if len(tds) > 7:
-            opgavenote = _normalize_text(tds[7].get_text(separator="\n"))
+            opgavenote = _normalize_text(_text(tds[7], "\n"))
 
         uid = f"{exerciseid}@lectio.dk"
         title = f"{status_raw} • {opgavetitel} • {hold} • {elevtid}"
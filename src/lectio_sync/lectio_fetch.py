@@ -1,13 +1,42 @@
 from __future__ import annotations
 
-from dataclasses import dataclass
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from dataclasses import dataclass, field
 from datetime import date, datetime, timedelta
+import functools
 import gzip
+import http.client
+import re
+import threading
+from types import MappingProxyType
 import zlib
-from typing import Iterable
+from typing import Callable, Iterable, Mapping
 from urllib.error import HTTPError, URLError
-from urllib.parse import parse_qs, urlencode, urlparse, urlunparse
-from urllib.request import Request, urlopen
+from urllib.parse import SplitResult, urljoin, urlsplit, urlunsplit
+from urllib.request import Request, getproxies, proxy_bypass, urlopen
+from zoneinfo import ZoneInfo
+
+
+_REDIRECT_CODES = frozenset({301, 302, 303, 307, 308})
+_MAX_REDIRECTS = 10
+
+_WEEK_PARAM_RE = re.compile(r"(^|&)week=[^&]*")
+
+# Request headers shared by every fetch; only the Cookie differs per call.
+_BASE_HEADERS: Mapping[str, str] = MappingProxyType(
+    {
+        # Make it look like a normal browser request.
+        "User-Agent": (
+            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
+            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+        ),
+        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
+        "Accept-Language": "da,en-US;q=0.9,en;q=0.8",
+        # HTML tables compress well; only gzip, since Brotli (br) needs extra deps.
+        "Accept-Encoding": "gzip",
+    }
+)
 
 
 @dataclass(frozen=True)
@@ -19,17 +48,28 @@ class FetchDiagnostics:
     content_encoding: str
     raw_bytes_len: int
     decoded_chars_len: int
+    etag: str = ""
+    last_modified: str = ""
 
+    @property
+    def not_modified(self) -> bool:
+        return self.status_code == 304
 
-@dataclass(frozen=True)
+
+@dataclass(frozen=True, slots=True)
 class LectioWeek:
     week: int
     year: int
+    # Observed Lectio format: WWYYYY (e.g. 062026). Derived, so formatted once here.
+    week_param: str = field(init=False, repr=False, compare=False)
 
-    @property
-    def week_param(self) -> str:
-        # Observed Lectio format: WWYYYY (e.g. 062026)
-        return f"{self.week:02d}{self.year}"
+    def __post_init__(self) -> None:
+        object.__setattr__(self, "week_param", f"{self.week:02d}{self.year}")
+
+
+@functools.lru_cache(maxsize=8)
+def _zone(timezone_name: str) -> ZoneInfo:
+    return ZoneInfo(timezone_name)
 
 
 def iter_weeks_for_window(*, timezone_name: str, days_past: int, days_future: int) -> list[LectioWeek]:
@@ -41,10 +81,7 @@ def iter_weeks_for_window(*, timezone_name: str, days_past: int, days_future: in
     """
 
     try:
-        from zoneinfo import ZoneInfo
-
-        tzinfo = ZoneInfo(timezone_name)
-        today = datetime.now(tzinfo).date()
+        today = datetime.now(_zone(timezone_name)).date()
     except Exception:
         # Fallback: local time; should not happen on Python 3.11+.
         today = date.today()
@@ -52,23 +89,16 @@ def iter_weeks_for_window(*, timezone_name: str, days_past: int, days_future: in
     window_start = today - timedelta(days=days_past)
     window_end = today + timedelta(days=days_future)
 
+    # Step Monday to Monday: every step is exactly one ISO week, so no dedup is needed.
+    # A window that ends before it starts yields just the end week.
+    last_monday = window_end - timedelta(days=window_end.weekday())
+    monday = min(window_start - timedelta(days=window_start.weekday()), last_monday)
+
     weeks: list[LectioWeek] = []
-    seen: set[tuple[int, int]] = set()
-
-    d = window_start
-    while d <= window_end:
-        iso_year, iso_week, _ = d.isocalendar()
-        key = (iso_week, iso_year)
-        if key not in seen:
-            seen.add(key)
-            weeks.append(LectioWeek(week=iso_week, year=iso_year))
-        d += timedelta(days=7)
-
-    # Ensure the end week is included even if the window is < 7 days
-    iso_year, iso_week, _ = window_end.isocalendar()
-    key = (iso_week, iso_year)
-    if key not in seen:
+    while monday <= last_monday:
+        iso_year, iso_week, _ = monday.isocalendar()
         weeks.append(LectioWeek(week=iso_week, year=iso_year))
+        monday += timedelta(days=7)
 
     return weeks
 
@@ -76,14 +106,185 @@ def iter_weeks_for_window(*, timezone_name: str, days_past: int, days_future: in
 def build_week_url(schedule_url: str, week: LectioWeek) -> str:
     """Return schedule_url with its querystring's week= set/overwritten."""
 
-    parsed = urlparse(schedule_url)
-    qs = parse_qs(parsed.query, keep_blank_values=True)
-    qs["week"] = [week.week_param]
+    return _build_week_url_from_parts(urlsplit(schedule_url), week)
+
+
+def _build_week_url_from_parts(parts: SplitResult, week: LectioWeek) -> str:
+    # Only week= changes, so edit the query in place instead of a parse_qs/urlencode
+    # round-trip; the other parameters keep their order and encoding.
+    query, n = _WEEK_PARAM_RE.subn(rf"\1week={week.week_param}", parts.query)
+    if not n:
+        query = f"{query}&week={week.week_param}" if query else f"week={week.week_param}"
+    return urlunsplit(parts._replace(query=query))
+
+
+class _PooledResponse(http.client.HTTPResponse):
+    """HTTPResponse that hands its connection back to the LectioSession on close()."""
+
+    release: Callable[[bool], None] | None = None
+    # Final URL after redirects, as on urlopen() responses.
+    url: str = ""
+
+    def close(self) -> None:
+        # fp is dropped once the body has been read to the end; only then is the
+        # connection positioned at the next response and safe to reuse.
+        reusable = self.fp is None
+        super().close()
+        release, self.release = self.release, None
+        if release is not None:
+            release(reusable)
+
 
-    new_query = urlencode(qs, doseq=True)
-    return urlunparse(parsed._replace(query=new_query))
+class LectioSession:
+    """Keep-alive HTTP(S) connections shared by a batch of Lectio fetches.
+
+    urlopen() opens and closes a new TCP/TLS connection for every request. All
+    Lectio pages live on the same host, so keeping the connection open saves a
+    handshake per page. http.client connections are not thread-safe, so each
+    request checks a connection out of a shared idle pool and returns it when
+    the response is closed; any thread can then pick it up again.
+
+    URLs that an HTTP_PROXY/HTTPS_PROXY setting applies to (and NO_PROXY does not
+    exempt) are fetched with plain urlopen() instead, without connection reuse.
+    """
+
+    def __init__(self) -> None:
+        # Read once, like the proxy settings of urlopen()'s default opener.
+        self._proxies = getproxies()
+        self._lock = threading.Lock()
+        self._idle: dict[tuple[str, str], list[http.client.HTTPConnection]] = {}
+        self._connections: list[http.client.HTTPConnection] = []
+
+    def __enter__(self) -> "LectioSession":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> bool:
+        self.close()
+        return False
+
+    def close(self) -> None:
+        with self._lock:
+            connections, self._connections = self._connections, []
+            self._idle = {}
+        for conn in connections:
+            conn.close()
+
+    def _connection(self, scheme: str, netloc: str, timeout: float) -> http.client.HTTPConnection:
+        with self._lock:
+            idle = self._idle.get((scheme, netloc))
+            conn = idle.pop() if idle else None
+        if conn is None:
+            conn_cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conn_cls(netloc, timeout=timeout)
+            conn.response_class = _PooledResponse
+            with self._lock:
+                self._connections.append(conn)
+        else:
+            conn.timeout = timeout
+            if conn.sock is not None:
+                conn.sock.settimeout(timeout)
+        return conn
+
+    def _release(self, key: tuple[str, str], conn: http.client.HTTPConnection, reusable: bool) -> None:
+        if not reusable:
+            conn.close()
+        with self._lock:
+            if conn in self._connections:
+                self._idle.setdefault(key, []).append(conn)
+
+    def _get(self, url: str, headers: dict[str, str], timeout: float) -> _PooledResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise URLError(f"unsupported URL scheme {parts.scheme!r}")
+        path = urlunsplit(("", "", parts.path or "/", parts.query, ""))
+
+        key = (parts.scheme, parts.netloc)
+        conn = self._connection(parts.scheme, parts.netloc, timeout)
+        reused = conn.sock is not None
+        try:
+            conn.request("GET", path, headers=headers)
+            resp = self._pooled_response(key, conn)
+        except (ConnectionError, http.client.HTTPException) as exc:
+            conn.close()
+            if not reused:
+                raise URLError(exc) from exc
+        except OSError as exc:
+            conn.close()
+            raise URLError(exc) from exc
+        else:
+            return resp
+
+        # The server closed an idle keep-alive connection; retry once on a fresh one.
+        try:
+            conn.request("GET", path, headers=headers)
+            return self._pooled_response(key, conn)
+        except (OSError, http.client.HTTPException) as exc:
+            conn.close()
+            raise URLError(exc) from exc
+
+    def _pooled_response(self, key: tuple[str, str], conn: http.client.HTTPConnection) -> _PooledResponse:
+        resp = conn.getresponse()
+        # Every pooled connection is created with response_class = _PooledResponse.
+        assert isinstance(resp, _PooledResponse)
+        resp.release = functools.partial(self._release, key, conn)
+        return resp
+
+    def _uses_proxy(self, url: str) -> bool:
+        parts = urlsplit(url)
+        return parts.scheme in self._proxies and not proxy_bypass(parts.hostname or "")
+
+    def open(self, url: str, *, headers: dict[str, str], timeout: float) -> http.client.HTTPResponse:
+        """GET `url`, following redirects the way urlopen() does.
+
+        The returned response has `.url` set to the final URL. Raises HTTPError
+        for 4xx/5xx responses and URLError for network failures.
+        """
+
+        if self._uses_proxy(url):
+            # The pooled connections talk to the host directly; let urllib's
+            # ProxyHandler handle HTTP(S)_PROXY instead of bypassing it.
+            return urlopen(Request(url, headers=headers, method="GET"), timeout=timeout)
+
+        for _ in range(_MAX_REDIRECTS + 1):
+            resp = self._get(url, headers, timeout)
+            location = resp.getheader("Location") if resp.status in _REDIRECT_CODES else None
+            if location is None and resp.status < 400:
+                resp.url = url
+                return resp
+            # Drain the body so the connection can be reused for the next request.
+            resp.read()
+            resp.close()
+            if location is None:
+                raise HTTPError(url, resp.status, resp.reason, resp.headers, None)
+            url = urljoin(url, location)
+        raise HTTPError(url, resp.status, "too many redirects", resp.headers, None)
+
+
+def _gunzip(raw: bytes) -> bytes:
+    # One-shot zlib inflate of the whole body; gzip.decompress parses each member's
+    # header in Python first. Multi-member or truncated bodies go through gzip.
+    d = zlib.decompressobj(16 + zlib.MAX_WBITS)
+    out = d.decompress(raw)
+    if not d.eof or d.unused_data:
+        return gzip.decompress(raw)
+    return out
+
+
+def _inflate(raw: bytes) -> bytes:
+    try:
+        return zlib.decompress(raw)
+    except zlib.error:
+        # Raw DEFLATE stream (no zlib header)
+        return zlib.decompress(raw, -zlib.MAX_WBITS)
 
 
+# Content-Encoding value -> decompressor; anything else is passed through as-is.
+_DECODERS: Mapping[str, Callable[[bytes], bytes]] = MappingProxyType(
+    {"gzip": _gunzip, "x-gzip": _gunzip, "deflate": _inflate}
+)
+
+
+@functools.lru_cache(maxsize=4)
 def _normalize_cookie_header(cookie_header: str) -> str:
     v = (cookie_header or "").strip()
     if not v:
@@ -101,44 +302,73 @@ def _normalize_cookie_header(cookie_header: str) -> str:
     return v
 
 
-def fetch_html_with_diagnostics(*, url: str, cookie_header: str, timeout_seconds: int = 30) -> tuple[str, FetchDiagnostics]:
-    """Fetch a Lectio HTML page and return both HTML and non-sensitive response diagnostics."""
+def fetch_html_with_diagnostics(
+    *,
+    url: str,
+    cookie_header: str,
+    timeout_seconds: int = 30,
+    session: LectioSession | None = None,
+    etag: str = "",
+    last_modified: str = "",
+) -> tuple[str, FetchDiagnostics]:
+    """Fetch a Lectio HTML page and return both HTML and non-sensitive response diagnostics.
+
+    Pass a LectioSession to reuse its keep-alive connections; otherwise a fresh
+    connection is opened via urlopen().
+
+    If `etag`/`last_modified` are given the request is conditional. When the
+    server answers 304 Not Modified, the returned HTML is empty and
+    `diag.not_modified` is True; the caller should reuse its cached copy.
+    """
+
+    return _fetch_html_with_clean_cookie(
+        url=url,
+        cookie_value=_required_cookie_value(cookie_header),
+        timeout_seconds=timeout_seconds,
+        session=session,
+        etag=etag,
+        last_modified=last_modified,
+    )
 
+
+def _required_cookie_value(cookie_header: str) -> str:
     cookie_value = _normalize_cookie_header(cookie_header)
     if not cookie_value:
         raise ValueError("cookie_header is required")
+    return cookie_value
 
-    headers = {
-        # Make it look like a normal browser request.
-        "User-Agent": (
-            "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 "
-            "(KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
-        ),
-        "Accept": "text/html,application/xhtml+xml,application/xml;q=0.9,*/*;q=0.8",
-        "Accept-Language": "da,en-US;q=0.9,en;q=0.8",
-        # Avoid Brotli (br) which we do not decode without extra deps.
-        "Accept-Encoding": "identity",
-        "Cookie": cookie_value,
-    }
 
-    req = Request(url, headers=headers, method="GET")
+def _fetch_html_with_clean_cookie(
+    *,
+    url: str,
+    cookie_value: str,
+    timeout_seconds: int,
+    session: LectioSession | None,
+    etag: str,
+    last_modified: str,
+) -> tuple[str, FetchDiagnostics]:
+    # fetch_html_with_diagnostics() minus the cookie normalization, which batch
+    # callers do once up front (normalizing is not idempotent for nested quotes).
+    headers = {**_BASE_HEADERS, "Cookie": cookie_value}
+    if etag:
+        headers["If-None-Match"] = etag
+    if last_modified:
+        headers["If-Modified-Since"] = last_modified
+
     try:
-        with urlopen(req, timeout=timeout_seconds) as resp:
+        if session is not None:
+            opened = session.open(url, headers=headers, timeout=timeout_seconds)
+        else:
+            opened = urlopen(Request(url, headers=headers, method="GET"), timeout=timeout_seconds)
+        with opened as resp:
             raw = resp.read()
 
-            content_type = (resp.headers.get("Content-Type") or "").strip()
-            content_encoding = (resp.headers.get("Content-Encoding") or "").strip().lower()
+            resp_headers = resp.headers
+            content_type = (resp_headers.get("Content-Type") or "").strip()
+            content_encoding = (resp_headers.get("Content-Encoding") or "").strip().lower()
+            # Both urlopen() and LectioSession responses carry .status and .url.
             status_code = getattr(resp, "status", None)
-            if status_code is None:
-                try:
-                    status_code = resp.getcode()
-                except Exception:
-                    status_code = None
-            final_url = ""
-            try:
-                final_url = resp.geturl() or ""
-            except Exception:
-                final_url = ""
+            final_url = getattr(resp, "url", None) or url
 
             if "br" in content_encoding:
                 raise RuntimeError(
@@ -148,54 +378,69 @@ def fetch_html_with_diagnostics(*, url: str, cookie_header: str, timeout_seconds
 
             # Some servers send compressed responses even when clients don't
             # explicitly ask. urllib does not automatically decompress.
-            if "gzip" in content_encoding:
-                raw = gzip.decompress(raw)
-            elif "deflate" in content_encoding:
-                try:
-                    raw = zlib.decompress(raw)
-                except zlib.error:
-                    # Raw DEFLATE stream (no zlib header)
-                    raw = zlib.decompress(raw, -zlib.MAX_WBITS)
+            decode = _DECODERS.get(content_encoding)
+            if decode is not None:
+                raw = decode(raw)
             elif raw[:2] == b"\x1f\x8b":
                 # Heuristic: gzip magic bytes.
                 try:
-                    raw = gzip.decompress(raw)
+                    raw = _gunzip(raw)
                 except Exception:
                     pass
 
             # lectio.dk pages are typically UTF-8
-            charset = "utf-8"
-            try:
-                content_charset = resp.headers.get_content_charset()
-                if content_charset:
-                    charset = content_charset
-            except Exception:
-                pass
+            get_charset = getattr(resp_headers, "get_content_charset", None)
+            charset = (get_charset() if get_charset is not None else None) or "utf-8"
 
             html = raw.decode(charset, errors="replace")
             diag = FetchDiagnostics(
                 requested_url=url,
-                final_url=final_url or url,
+                final_url=final_url,
                 status_code=status_code,
                 content_type=content_type,
                 content_encoding=content_encoding,
                 raw_bytes_len=len(raw),
                 decoded_chars_len=len(html),
+                etag=(resp_headers.get("ETag") or "").strip(),
+                last_modified=(resp_headers.get("Last-Modified") or "").strip(),
             )
             return html, diag
     except HTTPError as exc:
+        if exc.code == 304:
+            # urlopen() reports 304 as an error; it only happens for conditional requests.
+            hdrs = exc.headers if exc.headers is not None else {}
+            return "", FetchDiagnostics(
+                requested_url=url,
+                final_url=exc.url or url,
+                status_code=304,
+                content_type=(hdrs.get("Content-Type") or "").strip(),
+                content_encoding="",
+                raw_bytes_len=0,
+                decoded_chars_len=0,
+                etag=(hdrs.get("ETag") or etag).strip(),
+                last_modified=(hdrs.get("Last-Modified") or last_modified).strip(),
+            )
         raise RuntimeError(f"HTTP error fetching Lectio HTML: {exc.code} {exc.reason}") from exc
     except URLError as exc:
         raise RuntimeError(f"Network error fetching Lectio HTML: {exc.reason}") from exc
 
 
-def fetch_html(*, url: str, cookie_header: str, timeout_seconds: int = 30) -> str:
+def fetch_html(
+    *,
+    url: str,
+    cookie_header: str,
+    timeout_seconds: int = 30,
+    session: LectioSession | None = None,
+) -> str:
     """Fetch a Lectio HTML page using an existing authenticated session cookie.
 
     This does NOT perform MitID login. It relies on you providing a valid cookie header.
+    Pass a LectioSession to reuse its keep-alive connections across calls.
     """
 
-    html, _diag = fetch_html_with_diagnostics(url=url, cookie_header=cookie_header, timeout_seconds=timeout_seconds)
+    html, _diag = fetch_html_with_diagnostics(
+        url=url, cookie_header=cookie_header, timeout_seconds=timeout_seconds, session=session
+    )
     return html
 
 
@@ -205,13 +450,20 @@ def fetch_weeks_html(
     cookie_header: str,
     weeks: Iterable[LectioWeek],
     timeout_seconds: int = 30,
+    max_workers: int = 8,
+    session: LectioSession | None = None,
 ) -> list[tuple[LectioWeek, str]]:
-    out: list[tuple[LectioWeek, str]] = []
-    for wk in weeks:
-        url = build_week_url(schedule_url, wk)
-        html = fetch_html(url=url, cookie_header=cookie_header, timeout_seconds=timeout_seconds)
-        out.append((wk, html))
-    return out
+    """Fetch all weeks concurrently (see fetch_weeks_html_with_diagnostics), in order."""
+
+    results = fetch_weeks_html_with_diagnostics(
+        schedule_url=schedule_url,
+        cookie_header=cookie_header,
+        weeks=weeks,
+        timeout_seconds=timeout_seconds,
+        max_workers=max_workers,
+        session=session,
+    )
+    return [(wk, html) for wk, html, _diag in results]
 
 
 def fetch_weeks_html_with_diagnostics(
@@ -220,10 +472,56 @@ def fetch_weeks_html_with_diagnostics(
     cookie_header: str,
     weeks: Iterable[LectioWeek],
     timeout_seconds: int = 30,
+    max_workers: int = 8,
+    validators: Mapping[str, tuple[str, str]] | None = None,
+    session: LectioSession | None = None,
 ) -> list[tuple[LectioWeek, str, FetchDiagnostics]]:
-    out: list[tuple[LectioWeek, str, FetchDiagnostics]] = []
-    for wk in weeks:
-        url = build_week_url(schedule_url, wk)
-        html, diag = fetch_html_with_diagnostics(url=url, cookie_header=cookie_header, timeout_seconds=timeout_seconds)
-        out.append((wk, html, diag))
+    """Fetch all weeks concurrently and return results in the order of `weeks`.
+
+    Each fetch is network-bound, so a small thread pool turns N sequential
+    round-trips into roughly ceil(N / max_workers). The workers share one
+    LectioSession, so its connections stay open across the weeks they fetch.
+    Pass `session` to keep using those connections afterwards (the caller then
+    closes it); otherwise a private session is opened and closed here.
+
+    `validators` maps week_param to a cached (etag, last_modified) pair; those
+    weeks are fetched conditionally and come back with empty HTML and
+    `diag.not_modified` set when unchanged.
+    """
+
+    week_list = list(weeks)
+    if not week_list:
+        return []
+    validators = validators or {}
+    cookie_value = _required_cookie_value(cookie_header)
+    # Parse the schedule URL once; only its week= parameter differs between weeks.
+    schedule_parts = urlsplit(schedule_url)
+
+    with (nullcontext(session) if session is not None else LectioSession()) as session, ThreadPoolExecutor(
+        max_workers=max(1, min(max_workers, len(week_list)))
+    ) as executor:
+        futures = []
+        for wk in week_list:
+            etag, last_modified = validators.get(wk.week_param, ("", ""))
+            futures.append(
+                executor.submit(
+                    _fetch_html_with_clean_cookie,
+                    url=_build_week_url_from_parts(schedule_parts, wk),
+                    cookie_value=cookie_value,
+                    timeout_seconds=timeout_seconds,
+                    session=session,
+                    etag=etag,
+                    last_modified=last_modified,
+                )
+            )
+        out: list[tuple[LectioWeek, str, FetchDiagnostics]] = []
+        try:
+            for wk, future in zip(week_list, futures):
+                html, diag = future.result()
+                out.append((wk, html, diag))
+        except BaseException:
+            # Fail fast (e.g. an expired cookie): don't send the weeks still queued.
+            for future in futures:
+                future.cancel()
+            raise
     return out
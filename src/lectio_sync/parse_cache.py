@@ -0,0 +1,125 @@
+from __future__ import annotations
+
+import hashlib
+import importlib.metadata
+import json
+import os
+import re
+from datetime import date, datetime
+from functools import lru_cache
+from pathlib import Path
+
+import lectio_sync
+from lectio_sync.event_model import LectioEvent
+
+
+# ASP.NET hidden fields (__VIEWSTATEX, __EVENTVALIDATION, ...) change on every
+# request without affecting the schedule, so they are blanked before hashing.
+_HIDDEN_STATE_VALUE_RE = re.compile(r'(<input\b[^>]*\bname="__\w+"[^>]*\bvalue=")[^"]*', re.IGNORECASE)
+
+
+# Bump whenever parser output or the stored row format changes, so entries written
+# by an older parser are never served. The installed package version is part of the
+# key as well.
+CACHE_SCHEMA_VERSION = 2
+
+
+@lru_cache(maxsize=1)
+def _code_fingerprint() -> bytes:
+    try:
+        version = importlib.metadata.version("lectio-sync")
+    except importlib.metadata.PackageNotFoundError:
+        # Running from a source checkout without installing.
+        version = lectio_sync.__version__
+    return f"lectio-sync {version} schema {CACHE_SCHEMA_VERSION}".encode("utf-8")
+
+
+def parse_cache_key(html: str, *, timezone_name: str, emit_cancelled_events: bool) -> str:
+    h = hashlib.sha256(_code_fingerprint(), usedforsecurity=False)
+    h.update(f"\n{timezone_name}\n{int(emit_cancelled_events)}\n".encode("utf-8"))
+    h.update(_HIDDEN_STATE_VALUE_RE.sub(r"\1", html).encode("utf-8", "replace"))
+    return h.hexdigest()
+
+
+def _event_to_row(ev: LectioEvent) -> list[str | None]:
+    return [
+        ev.uid,
+        ev.title,
+        ev.start.isoformat() if ev.start is not None else None,
+        ev.end.isoformat() if ev.end is not None else None,
+        ev.all_day_date.isoformat() if ev.all_day_date is not None else None,
+        ev.location,
+        ev.description,
+        ev.status,
+    ]
+
+
+def _event_from_row(row: list[str | None]) -> LectioEvent:
+    uid, title, start, end, all_day_date, location, description, status = row
+    # Times come back with a fixed UTC offset instead of the named zone; the instant
+    # and the local wall-clock time (all the writer and window filter use) are kept.
+    return LectioEvent(
+        uid=str(uid),
+        title=str(title),
+        start=datetime.fromisoformat(start) if start is not None else None,
+        end=datetime.fromisoformat(end) if end is not None else None,
+        all_day_date=date.fromisoformat(all_day_date) if all_day_date is not None else None,
+        location=str(location),
+        description=str(description),
+        status=str(status),
+    )
+
+
+class ParsedEventsCache:
+    """On-disk cache of parsed (unfiltered) week events, keyed by page content.
+
+    One JSON file per entry, holding a row of plain field values per event. Data
+    only, so a tampered cache directory cannot run code when an entry is loaded.
+    The least recently used entries are evicted once there are more than
+    `max_entries`.
+
+    WARNING: the cache files contain private schedule data.
+    """
+
+    def __init__(self, directory: Path, *, max_entries: int = 64) -> None:
+        self.directory = directory
+        self.max_entries = max_entries
+
+    def _path(self, key: str) -> Path:
+        return self.directory / f"{key}.json"
+
+    def get(self, key: str) -> list[LectioEvent] | None:
+        path = self._path(key)
+        try:
+            events = [_event_from_row(row) for row in json.loads(path.read_bytes())]
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, TypeError):
+            # Unreadable, corrupt or malformed; treat as a miss.
+            path.unlink(missing_ok=True)
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return events
+
+    def put(self, key: str, events: list[LectioEvent]) -> None:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self._path(key)
+        tmp_path = path.with_name(path.name + ".tmp")
+        rows = [_event_to_row(ev) for ev in events]
+        tmp_path.write_text(json.dumps(rows, ensure_ascii=False, separators=(",", ":")), encoding="utf-8")
+        os.replace(tmp_path, path)
+        self._evict()
+
+    def _evict(self) -> None:
+        # Entries from the earlier pickle format are never read again.
+        for stale in self.directory.glob("*.pickle"):
+            stale.unlink(missing_ok=True)
+        entries = list(self.directory.glob("*.json"))
+        if len(entries) <= self.max_entries:
+            return
+        entries.sort(key=lambda p: p.stat().st_mtime)
+        for path in entries[: len(entries) - self.max_entries]:
+            path.unlink(missing_ok=True)
@@ -0,0 +1,59 @@
+from __future__ import annotations
+# pyright: reportMissingImports=false
+
+from pathlib import Path
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lectio_sync.config import load_config_from_env, load_config_from_env_with_overrides
+
+
+class ConfigTests(unittest.TestCase):
+    def test_env_values_defaults_and_overrides(self) -> None:
+        env = {
+            "LECTIO_HTML_PATH": "in.html",
+            "SYNC_DAYS_PAST": " 3 ",
+            "SYNC_DAYS_FUTURE": "",
+            "DELETE_MISSING": "off",
+            "EMIT_CANCELLED_EVENTS": "Yes",
+        }
+        with mock.patch.dict(os.environ, env, clear=True):
+            cfg = load_config_from_env_with_overrides(sync_days_future=14)
+
+        self.assertEqual(cfg.lectio_html_path, Path("in.html"))
+        self.assertEqual(cfg.output_ics_path, Path("docs/calendar.ics"))
+        self.assertEqual(cfg.timezone, "Europe/Copenhagen")
+        self.assertEqual(cfg.sync_days_past, 3)
+        self.assertEqual(cfg.sync_days_future, 14)
+        self.assertFalse(cfg.delete_missing)
+        self.assertTrue(cfg.emit_cancelled_events)
+
+    def test_plain_loader_reads_the_same_fields(self) -> None:
+        env = {"LECTIO_HTML_PATH": "in.html", "SYNC_DAYS_FUTURE": "30", "DELETE_MISSING": "0"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            cfg = load_config_from_env()
+
+        self.assertEqual(cfg.sync_days_past, 7)
+        self.assertEqual(cfg.sync_days_future, 30)
+        self.assertFalse(cfg.delete_missing)
+        self.assertFalse(cfg.emit_cancelled_events)
+
+    def test_invalid_boolean_names_the_variable(self) -> None:
+        env = {"LECTIO_HTML_PATH": "in.html", "DELETE_MISSING": "maybe"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            with self.assertRaisesRegex(ValueError, "DELETE_MISSING"):
+                load_config_from_env_with_overrides()
+
+    def test_invalid_integer_names_the_variable(self) -> None:
+        env = {"LECTIO_HTML_PATH": "in.html", "SYNC_DAYS_PAST": "7d"}
+        with mock.patch.dict(os.environ, env, clear=True):
+            with self.assertRaisesRegex(ValueError, "SYNC_DAYS_PAST.*'7d'"):
+                load_config_from_env_with_overrides()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,55 @@
+from __future__ import annotations
+# pyright: reportMissingImports=false
+
+from datetime import date
+from pathlib import Path
+import sys
+import tempfile
+import unittest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lectio_sync.fetch_cache import WeekPageCache
+from lectio_sync.lectio_fetch import LectioWeek
+
+
+_URL = "https://example.invalid/SkemaAvanceret.aspx?type=elev"
+
+
+class WeekPageCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.path = Path(self._tmp.name) / "weeks.json"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip_returns_validators_and_html(self) -> None:
+        far_week = LectioWeek(week=20, year=2026)
+        cache = WeekPageCache.load(self.path)
+        cache.store(_URL, far_week, "<html>w20</html>", etag='"abc"', last_modified="", now=0.0)
+        cache.save()
+
+        reloaded = WeekPageCache.load(self.path)
+        validators = reloaded.validators(_URL, [far_week], today=date(2026, 2, 26), now=10 * 86400.0)
+        self.assertEqual(validators, {"202026": ('"abc"', "")})
+        self.assertEqual(reloaded.cached_html(_URL, far_week), "<html>w20</html>")
+
+    def test_near_week_validators_expire_after_a_day(self) -> None:
+        this_week = LectioWeek(week=9, year=2026)
+        cache = WeekPageCache(self.path)
+        cache.store(_URL, this_week, "<html>w9</html>", etag='"abc"', last_modified="", now=0.0)
+
+        today = date(2026, 2, 26)
+        self.assertIn("092026", cache.validators(_URL, [this_week], today=today, now=3600.0))
+        self.assertEqual(cache.validators(_URL, [this_week], today=today, now=2 * 86400.0), {})
+
+    def test_entries_without_validators_are_not_kept(self) -> None:
+        week = LectioWeek(week=20, year=2026)
+        cache = WeekPageCache(self.path)
+        cache.store(_URL, week, "<html></html>", etag="", last_modified="")
+        self.assertIsNone(cache.cached_html(_URL, week))
+
+
+if __name__ == "__main__":
+    unittest.main()
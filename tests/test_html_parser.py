@@ -1,13 +1,22 @@
 from __future__ import annotations
 # pyright: reportMissingImports=false
 
+from datetime import date
 from pathlib import Path
+import heapq
 import sys
 import unittest
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from lectio_sync.html_parser import parse_lectio_advanced_schedule_html
+from lectio_sync import cli
+from lectio_sync.html_parser import (
+    _build_uid,
+    _normalize_text,
+    event_sort_key,
+    parse_lectio_advanced_schedule_html,
+    parse_lectio_advanced_schedule_html_text,
+)
 
 
 class HtmlParserTests(unittest.TestCase):
@@ -48,5 +57,80 @@ class HtmlParserTests(unittest.TestCase):
         self.assertTrue(any(e.status == "CANCELLED" for e in events))
 
 
+class ScheduleDocumentTests(unittest.TestCase):
+    def test_page_prefix_does_not_change_events(self) -> None:
+        table = (
+            '<table id="m_Content_SkemaMedNavigation_skema_skematabel"><tr><td data-date="2026-02-24">'
+            '<a class="s2skemabrik" data-brikid="ABS1" data-tooltip="Dansk\n24/2-2026 09:00 til 10:30">'
+            '<div class="s2skemabrikcontent">Dansk</div></a></td></tr></table>'
+        )
+        prefix = '<input type="hidden" name="__VIEWSTATEX" value="' + "x" * 5000 + '"/><div><a href="/a">Menu</a>'
+        bare = parse_lectio_advanced_schedule_html_text(f"<html><body>{table}</body></html>", "Europe/Copenhagen")
+        padded = parse_lectio_advanced_schedule_html_text(
+            f"<html><body><form>{prefix}{table}</div></form></body></html>", "Europe/Copenhagen"
+        )
+        self.assertEqual([e.uid for e in bare], ["ABS1@lectio.dk"])
+        self.assertEqual(padded, bare)
+
+
+def _week_page(day: str, bricks: list[tuple[str, str, str]]) -> str:
+    cells = "".join(
+        f'<a class="s2skemabrik" data-brikid="{brikid}" data-tooltip="{title}\n{when}">'
+        f'<div class="s2skemabrikcontent">{title}</div></a>'
+        for brikid, title, when in bricks
+    )
+    return (
+        '<html><body><table id="m_Content_SkemaMedNavigation_skema_skematabel">'
+        f'<tr><td data-date="{day}">{cells}</td></tr></table></body></html>'
+    )
+
+
+class SortKeyTests(unittest.TestCase):
+    def test_merging_parsed_weeks_matches_a_full_sort(self) -> None:
+        # Bricks are out of order on the page, and week 2's all-day event sorts
+        # before week 1's timed ones, so the merge has to interleave the weeks.
+        weeks = [
+            _week_page(
+                "2026-02-24",
+                [
+                    ("W1B", "Matematik", "24/2-2026 10:45 til 12:15"),
+                    ("W1A", "Dansk", "24/2-2026 10:45 til 12:15"),
+                    ("W1C", "Engelsk", "24/2-2026 08:00 til 09:30"),
+                ],
+            ),
+            _week_page(
+                "2026-03-03",
+                [
+                    ("W2A", "Fysik", "3/3-2026 08:00 til 09:30"),
+                    ("W2B", "Alle: Skolefest", "3/3-2026 Hele dagen"),
+                ],
+            ),
+        ]
+        parsed = [parse_lectio_advanced_schedule_html_text(html, "Europe/Copenhagen") for html in weeks]
+        all_events = [ev for week in parsed for ev in week]
+        self.assertEqual(len(all_events), 5)
+
+        self.assertIs(cli.event_sort_key, event_sort_key)
+        merged = list(heapq.merge(*parsed, key=event_sort_key))
+        self.assertEqual(merged, sorted(all_events, key=event_sort_key))
+        self.assertEqual(merged[0].uid, "W2B@lectio.dk")
+
+
+class NormalizeTextTests(unittest.TestCase):
+    def test_normalize_is_idempotent(self) -> None:
+        raw = "  Dansk <b>2</b>\r\n\r\n\r\n- - -  Husk bog\n-  Lektier\n\n"
+        once = _normalize_text(raw)
+        self.assertEqual(once, "Dansk 2\n\nHusk bog\nLektier")
+        self.assertEqual(_normalize_text(once), once)
+
+
+class BuildUidTests(unittest.TestCase):
+    def test_hash_uid_is_stable(self) -> None:
+        # Calendar clients track events by UID; changing the hash would duplicate them.
+        uid = _build_uid(None, "Dansk\n24/2-2026 09:00 til 10:30", date(2026, 2, 24))
+        self.assertEqual(uid, "lectio-ef72df3afd6100e1235afa67@lectio.dk")
+        self.assertEqual(_build_uid("ABS1", "ignored", date(2026, 2, 24)), "ABS1@lectio.dk")
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -4,6 +4,7 @@ from __future__ import annotations
 from datetime import date, datetime
 from pathlib import Path
 import sys
+import tempfile
 import unittest
 
 from dateutil import tz
@@ -11,7 +12,7 @@ from dateutil import tz
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
 from lectio_sync.event_model import LectioEvent
-from lectio_sync.ical_writer import build_icalendar
+from lectio_sync.ical_writer import build_icalendar, write_icalendar
 
 
 class ICalWriterTests(unittest.TestCase):
@@ -46,6 +47,22 @@ class ICalWriterTests(unittest.TestCase):
         self.assertIn("DESCRIPTION:Line 1\\, with comma\\; and semicolon\\\\ and newline\\n", ics)
         self.assertIn("\r\n ", ics)
 
+    def test_fold_never_splits_multibyte_characters(self) -> None:
+        event = LectioEvent(
+            uid="uid-3@lectio.dk",
+            title="Test",
+            start=None,
+            end=None,
+            all_day_date=date(2026, 2, 6),
+            location="",
+            description="æøå" * 60,
+        )
+
+        ics = build_icalendar([event])
+        for line in ics.split("\r\n"):
+            self.assertLessEqual(len(line.encode("utf-8")), 75)
+        self.assertIn("DESCRIPTION:" + "æøå" * 60, ics.replace("\r\n ", ""))
+
     def test_all_day_dtend_is_exclusive(self) -> None:
         """RFC5545: all-day DTEND must be the day AFTER DTSTART (exclusive)."""
         event = LectioEvent(
@@ -70,6 +87,14 @@ class ICalWriterTests(unittest.TestCase):
         ics = build_icalendar([])
         self.assertNotIn("X-WR-CALNAME", ics)
 
+    def test_write_creates_parent_dir_and_keeps_crlf(self) -> None:
+        with tempfile.TemporaryDirectory() as tmp:
+            out = Path(tmp) / "nested" / "calendar.ics"
+            write_icalendar(iter([]), out, cal_name="x")
+            data = out.read_bytes()
+        self.assertTrue(data.startswith(b"BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"))
+        self.assertTrue(data.endswith(b"END:VCALENDAR\r\n"))
+
 
 if __name__ == "__main__":
     unittest.main()
@@ -1,15 +1,29 @@
 from __future__ import annotations
 # pyright: reportMissingImports=false
 
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 import sys
+import threading
 import unittest
 from unittest.mock import patch
+from urllib.error import HTTPError
 import gzip
+import time
+import zlib
 
 sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
 
-from lectio_sync.lectio_fetch import fetch_html
+from lectio_sync.lectio_fetch import (
+    FetchDiagnostics,
+    LectioSession,
+    LectioWeek,
+    build_week_url,
+    fetch_html,
+    fetch_html_with_diagnostics,
+    fetch_weeks_html,
+    fetch_weeks_html_with_diagnostics,
+)
 
 
 class _FakeHeaders:
@@ -41,6 +55,29 @@ class _FakeResponse:
         return False
 
 
+class _KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    client_ports: list[int] = []
+
+    def do_GET(self) -> None:
+        self.client_ports.append(self.client_address[1])
+        if self.path == "/old":
+            self.send_response(302)
+            self.send_header("Location", "/new")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        body = f"<html><body>{self.path}</body></html>".encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args) -> None:
+        pass
+
+
 class LectioFetchTests(unittest.TestCase):
     def test_fetch_html_decompresses_gzip(self) -> None:
         html = "<html><body><table id='m_Content_SkemaMedNavigation_skema_skematabel'></table></body></html>"
@@ -55,7 +92,24 @@ class LectioFetchTests(unittest.TestCase):
         self.assertIn("<table", out)
         self.assertIn("m_Content_SkemaMedNavigation_skema_skematabel", out)
 
-    def test_fetch_html_strips_cookie_prefix_and_sets_identity_encoding(self) -> None:
+    def test_fetch_html_decompresses_deflate_and_headerless_gzip(self) -> None:
+        html = "<html><body>ok</body></html>".encode("utf-8")
+        raw_deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        raw_deflate = raw_deflate.compress(html) + raw_deflate.flush()
+        cases = [
+            ("deflate", zlib.compress(html)),
+            ("deflate", raw_deflate),
+            (None, gzip.compress(html)),
+        ]
+        for content_encoding, body in cases:
+            with patch(
+                "lectio_sync.lectio_fetch.urlopen",
+                lambda req, timeout=30: _FakeResponse(body=body, headers=_FakeHeaders(content_encoding=content_encoding)),
+            ):
+                out = fetch_html(url="https://example.invalid/", cookie_header="a=b", timeout_seconds=5)
+            self.assertEqual(out, html.decode("utf-8"))
+
+    def test_fetch_html_strips_cookie_prefix_and_requests_gzip(self) -> None:
         html = "<html><body>ok</body></html>"
         captured = {"cookie": None, "accept_encoding": None}
 
@@ -72,7 +126,138 @@ class LectioFetchTests(unittest.TestCase):
 
         self.assertEqual(out, html)
         self.assertEqual(captured["cookie"], "a=b; c=d")
-        self.assertEqual(captured["accept_encoding"], "identity")
+        self.assertEqual(captured["accept_encoding"], "gzip")
+
+    def test_fetch_html_sends_validators_and_reports_not_modified(self) -> None:
+        captured = {}
+
+        def _fake_urlopen(req, timeout=30):
+            captured.update({k.lower(): v for k, v in req.header_items()})
+            raise HTTPError(req.full_url, 304, "Not Modified", {"ETag": '"v1"'}, None)
+
+        with patch("lectio_sync.lectio_fetch.urlopen", _fake_urlopen):
+            html, diag = fetch_html_with_diagnostics(
+                url="https://example.invalid/",
+                cookie_header="a=b",
+                etag='"v1"',
+                last_modified="Wed, 25 Feb 2026 08:00:00 GMT",
+            )
+
+        self.assertEqual(captured["if-none-match"], '"v1"')
+        self.assertEqual(captured["if-modified-since"], "Wed, 25 Feb 2026 08:00:00 GMT")
+        self.assertEqual(html, "")
+        self.assertTrue(diag.not_modified)
+        self.assertEqual(diag.etag, '"v1"')
+
+    def test_build_week_url_sets_or_replaces_week(self) -> None:
+        wk = LectioWeek(week=6, year=2026)
+        base = "https://www.lectio.dk/lectio/1/SkemaNy.aspx"
+        self.assertEqual(build_week_url(base, wk), base + "?week=062026")
+        self.assertEqual(build_week_url(base + "?type=elev&elevid=7", wk), base + "?type=elev&elevid=7&week=062026")
+        self.assertEqual(build_week_url(base + "?week=052026&type=elev", wk), base + "?week=062026&type=elev")
+        self.assertEqual(build_week_url(base + "?type=elev&week=&x=1", wk), base + "?type=elev&week=062026&x=1")
+        self.assertEqual(build_week_url(base + "?myweek=1", wk), base + "?myweek=1&week=062026")
+
+    def test_fetch_weeks_preserves_week_order_when_fetched_concurrently(self) -> None:
+        weeks = [LectioWeek(week=w, year=2026) for w in (6, 7, 8, 9)]
+
+        def _fake_fetch(*, url, cookie_value, **_kwargs):
+            # The batch normalizes the cookie once and passes the clean value on.
+            self.assertEqual(cookie_value, "a=b")
+            # Earlier weeks finish last so completion order differs from input order.
+            week_param = url.split("week=")[1]
+            time.sleep(0.05 if week_param.startswith("06") else 0.0)
+            diag = FetchDiagnostics(
+                requested_url=url,
+                final_url=url,
+                status_code=200,
+                content_type="text/html",
+                content_encoding="",
+                raw_bytes_len=0,
+                decoded_chars_len=0,
+            )
+            return f"html-{week_param}", diag
+
+        with patch("lectio_sync.lectio_fetch._fetch_html_with_clean_cookie", _fake_fetch):
+            out = fetch_weeks_html_with_diagnostics(
+                schedule_url="https://example.invalid/SkemaAvanceret.aspx?type=elev",
+                cookie_header="Cookie: a=b",
+                weeks=weeks,
+                max_workers=4,
+            )
+            plain = fetch_weeks_html(
+                schedule_url="https://example.invalid/SkemaAvanceret.aspx?type=elev",
+                cookie_header="a=b",
+                weeks=weeks,
+                max_workers=4,
+            )
+
+        self.assertEqual([wk for wk, _html, _diag in out], weeks)
+        self.assertEqual([html for _wk, html, _diag in out], [f"html-{wk.week_param}" for wk in weeks])
+        self.assertEqual(plain, [(wk, f"html-{wk.week_param}") for wk in weeks])
+
+    def test_session_reuses_connection_and_follows_redirects(self) -> None:
+        _KeepAliveHandler.client_ports = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with LectioSession() as session:
+                first = fetch_html(url=f"{base}/a", cookie_header="a=b", session=session)
+                second, diag = fetch_html_with_diagnostics(url=f"{base}/old", cookie_header="a=b", session=session)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertIn("/a", first)
+        self.assertIn("/new", second)
+        self.assertEqual(diag.final_url, f"{base}/new")
+        self.assertEqual(len(_KeepAliveHandler.client_ports), 3)
+        self.assertEqual(len(set(_KeepAliveHandler.client_ports)), 1)
+
+    def test_session_defers_to_urlopen_when_a_proxy_is_configured(self) -> None:
+        opened: list[str] = []
+
+        def _fake_urlopen(req, timeout=30):
+            opened.append(req.full_url)
+            return _FakeResponse(body=b"<html>proxied</html>", headers=_FakeHeaders(content_encoding=None))
+
+        with (
+            patch("lectio_sync.lectio_fetch.getproxies", lambda: {"https": "http://proxy.invalid:3128"}),
+            patch("lectio_sync.lectio_fetch.proxy_bypass", lambda host: host == "intranet.invalid"),
+            patch("lectio_sync.lectio_fetch.urlopen", _fake_urlopen),
+        ):
+            with LectioSession() as session:
+                html = fetch_html(url="https://www.lectio.invalid/skema", cookie_header="a=b", session=session)
+                self.assertFalse(session._uses_proxy("https://intranet.invalid/skema"))
+                self.assertFalse(session._uses_proxy("http://www.lectio.invalid/skema"))
+
+        self.assertEqual(html, "<html>proxied</html>")
+        self.assertEqual(opened, ["https://www.lectio.invalid/skema"])
+
+    def test_session_hands_idle_connection_to_another_thread(self) -> None:
+        _KeepAliveHandler.client_ports = []
+        server = ThreadingHTTPServer(("127.0.0.1", 0), _KeepAliveHandler)
+        thread = threading.Thread(target=server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+        thread.start()
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            with LectioSession() as session:
+                worker = threading.Thread(
+                    target=fetch_html_with_diagnostics,
+                    kwargs={"url": f"{base}/week", "cookie_header": "a=b", "session": session},
+                )
+                worker.start()
+                worker.join()
+                html, _diag = fetch_html_with_diagnostics(url=f"{base}/assignments", cookie_header="a=b", session=session)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+        self.assertIn("/assignments", html)
+        self.assertEqual(len(_KeepAliveHandler.client_ports), 2)
+        self.assertEqual(len(set(_KeepAliveHandler.client_ports)), 1)
 
 
 if __name__ == "__main__":
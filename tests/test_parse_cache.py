@@ -0,0 +1,114 @@
+from __future__ import annotations
+# pyright: reportMissingImports=false
+
+from datetime import date, datetime
+from pathlib import Path
+import os
+import sys
+import tempfile
+import unittest
+from unittest.mock import patch
+
+from dateutil import tz
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from lectio_sync import parse_cache
+from lectio_sync.event_model import LectioEvent
+from lectio_sync.parse_cache import ParsedEventsCache, parse_cache_key
+
+
+def _event(uid: str) -> LectioEvent:
+    return LectioEvent(
+        uid=uid,
+        title="Matematik",
+        start=None,
+        end=None,
+        all_day_date=date(2026, 1, 5),
+        location="",
+        description="",
+    )
+
+
+class ParseCacheKeyTests(unittest.TestCase):
+    def test_key_ignores_hidden_aspnet_state(self) -> None:
+        a = '<input type="hidden" name="__VIEWSTATEX" id="__VIEWSTATEX" value="aaa" /><table></table>'
+        b = '<input type="hidden" name="__VIEWSTATEX" id="__VIEWSTATEX" value="bbb" /><table></table>'
+        c = '<input type="hidden" name="__VIEWSTATEX" id="__VIEWSTATEX" value="aaa" /><table>x</table>'
+        key = lambda html: parse_cache_key(html, timezone_name="Europe/Copenhagen", emit_cancelled_events=False)
+        self.assertEqual(key(a), key(b))
+        self.assertNotEqual(key(a), key(c))
+
+    def test_key_depends_on_parse_options(self) -> None:
+        html = "<table></table>"
+        self.assertNotEqual(
+            parse_cache_key(html, timezone_name="Europe/Copenhagen", emit_cancelled_events=False),
+            parse_cache_key(html, timezone_name="Europe/Copenhagen", emit_cancelled_events=True),
+        )
+
+    def test_key_depends_on_cache_schema_version(self) -> None:
+        key = lambda: parse_cache_key("<table></table>", timezone_name="Europe/Copenhagen", emit_cancelled_events=False)
+        before = key()
+        parse_cache._code_fingerprint.cache_clear()
+        try:
+            with patch.object(parse_cache, "CACHE_SCHEMA_VERSION", parse_cache.CACHE_SCHEMA_VERSION + 1):
+                self.assertNotEqual(key(), before)
+        finally:
+            parse_cache._code_fingerprint.cache_clear()
+        self.assertEqual(key(), before)
+
+
+class ParsedEventsCacheTests(unittest.TestCase):
+    def setUp(self) -> None:
+        self._tmp = tempfile.TemporaryDirectory()
+        self.directory = Path(self._tmp.name) / "parsed"
+
+    def tearDown(self) -> None:
+        self._tmp.cleanup()
+
+    def test_round_trip_and_lru_eviction(self) -> None:
+        cache = ParsedEventsCache(self.directory, max_entries=2)
+        self.assertIsNone(cache.get("a"))
+
+        cache.put("a", [_event("uid-a")])
+        cache.put("b", [_event("uid-b")])
+        os.utime(self.directory / "a.json", (0, 0))
+        os.utime(self.directory / "b.json", (1, 1))
+        self.assertEqual([ev.uid for ev in cache.get("a") or []], ["uid-a"])  # refreshes "a"
+
+        cache.put("c", [_event("uid-c")])
+        self.assertIsNone(cache.get("b"))
+        self.assertIsNotNone(cache.get("a"))
+        self.assertIsNotNone(cache.get("c"))
+
+
+    def test_timed_events_round_trip(self) -> None:
+        cph = tz.gettz("Europe/Copenhagen")
+        event = LectioEvent(
+            uid="uid-t",
+            title="Fysik æøå",
+            start=datetime(2026, 3, 29, 1, 30, tzinfo=cph),
+            end=datetime(2026, 3, 29, 3, 30, tzinfo=cph),
+            all_day_date=None,
+            location="2.29",
+            description="Lektier\nside 4",
+            status="CANCELLED",
+        )
+        cache = ParsedEventsCache(self.directory)
+        cache.put("t", [event])
+        (loaded,) = cache.get("t") or []
+        self.assertEqual(loaded, event)
+        self.assertEqual(loaded.start.strftime("%H:%M"), "01:30")
+        self.assertEqual(loaded.end.strftime("%H:%M"), "03:30")
+
+    def test_corrupt_entry_is_a_miss(self) -> None:
+        cache = ParsedEventsCache(self.directory)
+        cache.put("a", [_event("uid-a")])
+        for content in (b"\x80\x05not json", b'[["too", "short"]]', b"[1]"):
+            (self.directory / "a.json").write_bytes(content)
+            self.assertIsNone(cache.get("a"))
+            self.assertFalse((self.directory / "a.json").exists())
+
+
+if __name__ == "__main__":
+    unittest.main()